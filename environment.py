@@ -4,32 +4,14 @@ import json
 import threading
 from dataclasses import asdict
 from pathlib import Path
-from typing import Iterator, Iterable, Optional
+from typing import Iterator, Iterable
 
-import sublime
 import sublime_plugin
 
 from .internal import virtual_environment as venv
+from .internal.constant import SET_ENVIRONMENT_COMMAND
 from .internal.sublime_settings import Settings
-
-
-def get_workspace_path(view: sublime.View) -> Optional[Path]:
-    try:
-        file_name = Path(view.file_name())
-    except TypeError:
-        # file_name is None
-        return None
-
-    folders = [
-        folder
-        for folder in view.window().folders()
-        if str(file_name).startswith(folder)
-    ]
-    if not folders:
-        return None
-
-    # return folder nearest to file
-    return Path(max(folders))
+from .internal.workspace import get_workspace_path
 
 
 class PythonToolsSetEnvironmentCommand(sublime_plugin.WindowCommand):
@@ -56,7 +38,7 @@ class PythonToolsSetEnvironmentCommand(sublime_plugin.WindowCommand):
                 return
 
             elif index == scan_environments_index:
-                self.window.run_command("python_tools_set_environment", {"scan": True})
+                self.window.run_command(SET_ENVIRONMENT_COMMAND, {"scan": True})
                 return
 
             # Process in thread to prevent blocking
@@ -75,7 +57,7 @@ class PythonToolsSetEnvironmentCommand(sublime_plugin.WindowCommand):
     def scan_managers(self) -> Iterator[venv.EnvironmentManager]:
         workdir = ""
         if view := self.window.active_view():
-            workdir = get_workspace_path(view)
+            workdir = get_workspace_path(view, return_parent=False)
 
         yield from venv.scan(workdir)
 
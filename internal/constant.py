@@ -6,5 +6,14 @@ LOGGING_CHANNEL = PACKAGE_NAME
 
 # Sublime Text constants
 VIEW_SELECTOR = "source.python"
+SIGNATUREHELP_SELECTOR = "meta.function-call.arguments"
+COMMENT_SELECTOR = "comment"
+STRING_SELECTOR = "string"
 SETTINGS_BASENAME = "Python.sublime-settings"
 COMMAND_PREFIX = "python_tools"
+
+# command names, must match 'PythonTools*Command' classes
+APPLY_TEXT_CHANGES_COMMAND = f"{COMMAND_PREFIX}_apply_text_changes"
+DOCUMENT_SIGNATURE_HELP_COMMAND = f"{COMMAND_PREFIX}_document_signature_help"
+RENAME_COMMAND = f"{COMMAND_PREFIX}_rename"
+SET_ENVIRONMENT_COMMAND = f"{COMMAND_PREFIX}_set_environment"
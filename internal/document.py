@@ -1,22 +1,27 @@
 """Document handler module"""
 
 import logging
+import mmap
+import os
+import sys
 import time
 from collections import namedtuple
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from functools import lru_cache
+from itertools import accumulate
 from pathlib import Path
-from typing import List, Tuple
-from urllib.parse import urlparse, unquote_plus
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse, unquote_plus, quote_from_bytes
 from urllib.request import url2pathname
 
 import sublime
 
 from .constant import (
+    PACKAGE_NAME,
     LOGGING_CHANNEL,
     LANGUAGE_ID,
     VIEW_SELECTOR,
-    COMMAND_PREFIX,
+    APPLY_TEXT_CHANGES_COMMAND,
 )
 
 PathStr = str
@@ -26,28 +31,84 @@ Span = Tuple[int, int]
 LOGGER = logging.getLogger(LOGGING_CHANNEL)
 
 
-@lru_cache(128)
+@lru_cache(4096)
 def path_to_uri(path: PathStr) -> DocumentURI:
     """convert path to uri"""
+
+    # Fast path for normalized posix absolute path, same as 'Path.as_uri()'
+    # result. Path collapse repeated separator, '.' and trailing separator,
+    # let Path normalize it so one file always has one uri.
+    if (
+        os.name != "nt"
+        and path.startswith("/")
+        and "//" not in path
+        and "/./" not in path
+        and not path.endswith(("/", "/."))
+    ):
+        return "file://" + quote_from_bytes(os.fsencode(path))
+
     return Path(path).as_uri()
 
 
-@lru_cache(128)
+@lru_cache(4096)
 def uri_to_path(uri: DocumentURI) -> PathStr:
     """convert uri to path"""
-    parsed = urlparse(uri)
-    if parsed.scheme != "file":
-        raise ValueError("url scheme must be 'file'")
 
-    return url2pathname(unquote_plus(parsed.path))
+    # fast path for local file uri, 'file:///<path>'
+    if uri.startswith("file:///") and not ("?" in uri or "#" in uri):
+        path = uri[len("file://") :]
+    else:
+        parsed = urlparse(uri)
+        if parsed.scheme != "file":
+            raise ValueError("url scheme must be 'file'")
+        path = parsed.path
+
+    # file names are used as lookup keys, intern them to compare by identity
+    return sys.intern(url2pathname(unquote_plus(path)))
+
+
+# Cached 'is_valid_document()' result mapped by view id
+_VALID_DOCUMENT_CACHE: Dict[int, bool] = {}
+_VALID_DOCUMENT_SETTINGS_KEY = f"{PACKAGE_NAME}_valid_document"
 
 
 def is_valid_document(view: sublime.View) -> bool:
     """check if view is valid document"""
 
+    view_id = view.id()
+    try:
+        return _VALID_DOCUMENT_CACHE[view_id]
+    except KeyError:
+        pass
+
     if not view.file_name():
-        return False
-    return view.match_selector(0, VIEW_SELECTOR)
+        valid = False
+    elif syntax := view.syntax():
+        # match syntax scope directly, no buffer scope lookup
+        valid = sublime.score_selector(syntax.scope, VIEW_SELECTOR) > 0
+    else:
+        valid = False
+
+    # syntax may not assigned until view loaded
+    if not view.is_loading():
+        _VALID_DOCUMENT_CACHE[view_id] = valid
+
+        # syntax is stored in view settings, invalidate if settings changed
+        settings = view.settings()
+        settings.clear_on_change(_VALID_DOCUMENT_SETTINGS_KEY)
+        settings.add_on_change(
+            _VALID_DOCUMENT_SETTINGS_KEY,
+            lambda: _VALID_DOCUMENT_CACHE.pop(view_id, None),
+        )
+
+    return valid
+
+
+def invalidate_document_validity(view: sublime.View) -> None:
+    """invalidate cached 'is_valid_document()' result,
+    call if view file name or syntax may changed.
+    """
+    _VALID_DOCUMENT_CACHE.pop(view.id(), None)
 
 
 @dataclass
@@ -62,82 +123,139 @@ class TextChange:
         self.start = RowColIndex(*self.start)
         self.end = RowColIndex(*self.end)
 
+    def to_dict(self) -> dict:
+        """serialize as command argument"""
+        return {
+            "start": list(self.start),
+            "end": list(self.end),
+            "text": self.text,
+            "length": self.length,
+        }
+
 
 class _UnbufferedTextChange:
-    __slots__ = ["span", "old_text", "new_text"]
+    __slots__ = ["span", "new_text"]
 
-    def __init__(self, span: Span, old_text: str, new_text: str) -> None:
+    def __init__(self, span: Span, new_text: str) -> None:
         self.span = span
-        self.old_text = old_text
         self.new_text = new_text
 
-    def offset_move(self) -> int:
-        return len(self.new_text) - len(self.old_text)
 
-    def get_moved_span(self, move: int) -> Span:
-        return (self.span[0] + move, self.span[1] + move)
+def read_text(file_name: PathStr) -> str:
+    """read file content through mmap to skip intermediate bytes copy"""
+
+    with open(file_name, "rb") as file:
+        try:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty file can't be mapped
+            return ""
+
+        with buffer:
+            text = str(buffer, "utf-8")
+
+    # follow universal newline like 'Path.read_text()'
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
 
 
 class UnbufferedDocument:
     def __init__(self, file_name: PathStr):
         self.file_name = file_name
-        self.text = Path(file_name).read_text()
         self.is_saved = True
 
+        # file content loaded on first access
+        self._text: Optional[str] = None
         self._cached_lines = []
+        self._cached_line_starts = []
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = read_text(self.file_name)
+        return self._text
+
+    @text.setter
+    def text(self, value: str):
+        self._text = value
 
     def lines(self) -> List[str]:
-        if not all([self.is_saved, self._cached_lines]):
+        if not self._cached_lines:
             self._cached_lines = self.text.splitlines(keepends=True)
         return self._cached_lines
 
+    def line_starts(self) -> List[int]:
+        """offset of each line start, last item is the text length"""
+        if not self._cached_line_starts:
+            self._cached_line_starts = list(
+                accumulate((len(line) for line in self.lines()), initial=0)
+            )
+        return self._cached_line_starts
+
     def apply_changes(self, text_changes: List[TextChange]):
         self.is_saved = False
         self.text = self._update_text(self.text, text_changes)
 
+        # invalidate cache
+        self._cached_lines = []
+        self._cached_line_starts = []
+
     def _update_text(self, source: str, changes: List[TextChange]) -> str:
         text_changes = [self.to_text_change(c) for c in changes]
+        # spans refer to source text, apply from start to end of document
+        text_changes.sort(key=lambda c: c.span[0])
 
-        temp = source
-        move = 0
+        # build text from fragments to avoid copying whole text for each change
+        fragments = []
+        cursor = 0
         for change in text_changes:
-            start_offset, end_offset = change.get_moved_span(move)
-            temp = f"{temp[:start_offset]}{change.new_text}{temp[end_offset:]}"
-            move += change.offset_move()
+            start_offset, end_offset = change.span
+            fragments.append(source[cursor:start_offset])
+            fragments.append(change.new_text)
+            cursor = end_offset
 
-        return temp
+        fragments.append(source[cursor:])
+        return "".join(fragments)
 
     def calculate_offset(self, row: int, column: int) -> int:
-        line_offset = sum([len(l) for l in self.lines()[:row]])
+        line_starts = self.line_starts()
+        # row may point past the last line
+        line_offset = line_starts[min(row, len(line_starts) - 1)]
         return line_offset + column
 
     def to_text_change(self, change: TextChange) -> _UnbufferedTextChange:
         start = self.calculate_offset(*change.start)
         end = self.calculate_offset(*change.end)
 
-        old_text = self.text[start:end]
-        new_text = change.text
-
-        return _UnbufferedTextChange((start, end), old_text, new_text)
+        return _UnbufferedTextChange((start, end), change.text)
 
     def save(self):
-        Path(self.file_name).write_text(self.text)
+        # same encoding as 'read_text()', not locale encoding
+        Path(self.file_name).write_text(self.text, encoding="utf-8")
         self.is_saved = True
 
 
 class BufferedDocument:
-    VIEW_SETTINGS = {
-        "show_definitions": False,
-        "auto_complete_use_index": False,
-    }
+    # (key, value) pairs, applied with 'Settings.set()' without mapping conversion
+    VIEW_SETTINGS = (
+        ("show_definitions", False),
+        ("auto_complete_use_index", False),
+    )
 
     def __init__(self, view: sublime.View):
         self.view = view
         self.file_name = self.view.file_name()
+        if self.file_name:
+            self.file_name = sys.intern(self.file_name)
         self.language_id = LANGUAGE_ID
 
-        self.view.settings().update(self.VIEW_SETTINGS)
+        settings = self.view.settings()
+        for key, value in self.VIEW_SETTINGS:
+            settings.set(key, value)
         self._cached_completion = None
+        # (version, text)
+        self._cached_text: Tuple[int, str] = (-1, "")
 
     @property
     def window(self) -> sublime.Window:
@@ -149,11 +267,19 @@ class BufferedDocument:
 
     @property
     def text(self):
-        # wait until complete loaded
+        # wait until complete loaded, poll often first then back off
+        delay = 0.005
         while self.view.is_loading():
-            time.sleep(0.5)
+            time.sleep(delay)
+            delay = min(delay * 2, 0.1)
+
+        # view content only changed if version changed
+        version = self.version
+        if self._cached_text[0] != version:
+            text = self.view.substr(sublime.Region(0, self.view.size()))
+            self._cached_text = (version, text)
 
-        return self.view.substr(sublime.Region(0, self.view.size()))
+        return self._cached_text[1]
 
     def save(self):
         self.view.run_command("save")
@@ -193,8 +319,8 @@ class BufferedDocument:
 
     def apply_changes(self, text_changes: List[TextChange]):
         self.view.run_command(
-            f"{COMMAND_PREFIX}_apply_text_changes",
+            APPLY_TEXT_CHANGES_COMMAND,
             {
-                "changes": [asdict(c) for c in text_changes],
+                "changes": [c.to_dict() for c in text_changes],
             },
         )
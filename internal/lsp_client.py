@@ -3,12 +3,14 @@
 import json
 import logging
 import os
+import queue
 import re
 import threading
+import time
 import subprocess
 import shlex
 from abc import ABC, abstractmethod
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from functools import lru_cache
 from io import BytesIO
 from pathlib import Path
@@ -17,8 +19,23 @@ from typing import Optional, Union, List, Dict, Set
 from . import errors
 from .constant import LOGGING_CHANNEL
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 LOGGER = logging.getLogger(LOGGING_CHANNEL)
 
+if orjson:
+    json_dumps = orjson.dumps
+    json_loads = orjson.loads
+else:
+
+    def json_dumps(obj: object) -> bytes:
+        return json.dumps(obj).encode()
+
+    json_loads = json.loads
+
 
 class MethodName(str):
     """Method name"""
@@ -52,7 +69,7 @@ class Response(Message):
 def loads(json_str: Union[str, bytes]) -> Message:
     """loads json-rpc message"""
 
-    dct = json.loads(json_str)
+    dct = json_loads(json_str)
     try:
         if (jsonrpc_version := dct.pop("jsonrpc")) and jsonrpc_version != "2.0":
             raise ValueError("invalid jsonrpc version")
@@ -67,22 +84,36 @@ def loads(json_str: Union[str, bytes]) -> Message:
     return Response(**dct)
 
 
+@lru_cache(maxsize=64)
+def _encoded_method_prefix(method: MethodName) -> bytes:
+    """encoded jsonrpc version and method without closing brace"""
+    return json_dumps({"jsonrpc": "2.0", "method": method})[:-1]
+
+
 def dumps(message: Message, as_bytes: bool = False) -> Union[str, bytes]:
     """dumps json-rpc message"""
 
-    dct = asdict(message)
-    dct["jsonrpc"] = "2.0"
-
     if isinstance(message, Response):
+        dct = {"jsonrpc": "2.0", "id": message.id}
         if message.error is None:
-            del dct["error"]
+            dct["result"] = message.result
         else:
-            del dct["result"]
+            dct["error"] = message.error
+        content = json_dumps(dct)
+
+    else:
+        # only params encoded for each message, 'asdict()' not used because
+        # it deep copy the params
+        prefix = _encoded_method_prefix(message.method)
+        params = json_dumps(message.params)
+        if isinstance(message, Request):
+            content = b'%s, "id": %d, "params": %s}' % (prefix, message.id, params)
+        else:
+            content = b'%s, "params": %s}' % (prefix, params)
 
-    json_str = json.dumps(dct)
     if as_bytes:
-        return json_str.encode()
-    return json_str
+        return content
+    return content.decode()
 
 
 class Handler(ABC):
@@ -143,6 +174,11 @@ class Transport(ABC):
         """read data from server"""
 
 
+WRITE_QUEUE_SIZE = 1024
+"""maximum pending message to write, caller blocked if queue full"""
+TERMINATE_TIMEOUT = 2.0
+"""maximum time in seconds to wait killed process terminated"""
+
 if os.name == "nt":
     STARTUPINFO = subprocess.STARTUPINFO()
     # Hide created process window
@@ -160,6 +196,8 @@ class StandardIO(Transport):
 
         self._process: subprocess.Popen = None
         self._run_proces_event = threading.Event()
+        self._write_queue: "queue.Queue[Optional[bytes]]" = None
+        self._write_thread: threading.Thread = None
 
     def is_running(self):
         try:
@@ -182,6 +220,16 @@ class StandardIO(Transport):
             startupinfo=STARTUPINFO,
         )
 
+        # each process has its own write queue, so writer of terminated
+        # process never write to the new one
+        self._write_queue = queue.Queue(maxsize=WRITE_QUEUE_SIZE)
+        self._write_thread = threading.Thread(
+            target=self._write_task,
+            args=(self._process.stdin, self._write_queue),
+            daemon=True,
+        )
+        self._write_thread.start()
+
         # ready to call 'Popen()' object
         self._run_proces_event.set()
 
@@ -219,25 +267,55 @@ class StandardIO(Transport):
         # else:
         return
 
+    @staticmethod
+    def _write_task(stdin, write_queue: "queue.Queue[Optional[bytes]]"):
+        # 'None' sent to stop writer
+        while (data := write_queue.get()) is not None:
+            try:
+                stdin.write(data)
+                stdin.flush()
+            except (OSError, ValueError) as err:
+                # stdin closed
+                LOGGER.debug("write failed: %s", err)
+                break
+
     def terminate(self):
         """terminate process"""
 
         # reset state
         self._run_proces_event.clear()
 
+        if self._write_queue:
+            # Let writer send queued messages, e.g. 'didClose', before
+            # process killed. Wait no longer than terminate timeout.
+            deadline = time.monotonic() + TERMINATE_TIMEOUT
+            try:
+                self._write_queue.put(None, timeout=TERMINATE_TIMEOUT)
+            except queue.Full:
+                # writer stopped at failed write after process killed
+                LOGGER.debug("write queue full, pending messages discarded")
+            else:
+                self._write_thread.join(max(deadline - time.monotonic(), 0))
+
+            self._write_queue = None
+            self._write_thread = None
+
         if self._process:
             self._process.kill()
             # wait until terminated
-            self._process.wait()
+            try:
+                self._process.wait(TERMINATE_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                LOGGER.error("process %s not terminated", self._process.pid)
             # set to None to release 'Popen()' object from memory
             self._process = None
 
     def write(self, data: bytes):
         self._run_proces_event.wait()
 
-        prepared_data = wrap_rpc(data)
-        self.stdin.write(prepared_data)
-        self.stdin.flush()
+        # Write in writer thread, caller not blocked by full pipe buffer.
+        if write_queue := self._write_queue:
+            write_queue.put(wrap_rpc(data))
 
     def read(self):
         self._run_proces_event.wait()
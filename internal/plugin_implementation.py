@@ -2,17 +2,115 @@
 
 import logging
 import threading
-from typing import List, Optional
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import accumulate
+from typing import Callable, Dict, List, Optional, Set, Tuple
 
 import sublime
 from sublime import HoverZone
 
-from .constant import LOGGING_CHANNEL, COMMAND_PREFIX
-from .document import TextChange, is_valid_document
+from .constant import (
+    LOGGING_CHANNEL,
+    COMMENT_SELECTOR,
+    STRING_SELECTOR,
+    DOCUMENT_SIGNATURE_HELP_COMMAND,
+    SIGNATUREHELP_SELECTOR,
+)
+from .document import TextChange, is_valid_document, invalidate_document_validity
 from .session import Session
 from .pyserver_implementation import get_envs_settings
 
 LOGGER = logging.getLogger(LOGGING_CHANNEL)
+COMPLETION_REQUEST_DELAY = 50
+"""completion request debounce delay in milliseconds"""
+TEXT_CHANGE_FLUSH_DELAY = 30
+"""text changes batching window in milliseconds, must be shorter than
+completion request delay so server receive changes before request"""
+SIGNATUREHELP_REQUEST_DELAY = 80
+"""signature help request debounce delay in milliseconds"""
+REACTIVATION_IGNORE_WINDOW = 0.2
+"""ignore same view activated again within this time in seconds"""
+
+
+CacheKey = Tuple[int, int, int]
+"""(buffer_id, row, column) of completion word start"""
+
+
+class CompletionCache:
+    """completion items cache mapped by word start location"""
+
+    def __init__(self, maxsize: int = 32):
+        self.maxsize = maxsize
+        # items stored with the prefix used to request it
+        self._items: Dict[CacheKey, Tuple[str, List[sublime.CompletionItem]]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def get(self, key: CacheKey, prefix: str) -> Optional[List[sublime.CompletionItem]]:
+        """get items if prefix extends the requested prefix"""
+        with self._lock:
+            if not (entry := self._items.get(key)):
+                return None
+
+            requested_prefix, items = entry
+            # word deleted or retyped, server may return other items
+            if not prefix.startswith(requested_prefix):
+                del self._items[key]
+                return None
+
+            self._items.move_to_end(key)
+            return items
+
+    def set(
+        self, key: CacheKey, prefix: str, items: List[sublime.CompletionItem]
+    ) -> None:
+        with self._lock:
+            self._items[key] = (prefix, items)
+            self._items.move_to_end(key)
+            if len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def clear(self, buffer_id: int) -> None:
+        """clear cache for buffer"""
+        with self._lock:
+            for key in [k for k in self._items if k[0] == buffer_id]:
+                del self._items[key]
+
+    def invalidate(self, buffer_id: int, changes: List[TextChange]) -> None:
+        """invalidate cache for buffer affected by changes.
+
+        Cache still valid if changes only modify text in the same line
+        after the word start.
+        """
+
+        def is_affected(key: CacheKey) -> bool:
+            _, row, column = key
+            for change in changes:
+                if (
+                    change.start.row != row
+                    or change.end.row != row
+                    or change.start.column < column
+                    or "\n" in change.text
+                ):
+                    return True
+            return False
+
+        with self._lock:
+            for key in [k for k in self._items if k[0] == buffer_id and is_affected(k)]:
+                del self._items[key]
+
+
+COMPLETION_CACHE = CompletionCache()
+
+
+def fuzzy_match(query: str, text: str) -> bool:
+    """check if query characters appear in text in order, case insensitive"""
+    chars = iter(text.lower())
+    return all(c in chars for c in query.lower())
 
 
 def initialize_server(session: Session, view: sublime.View):
@@ -21,13 +119,35 @@ def initialize_server(session: Session, view: sublime.View):
     session.initialize(view)
 
 
+_INITIALIZING_VIEWS: Set[int] = set()
+"""id of views running server initializer"""
+_INITIALIZING_VIEWS_LOCK = threading.Lock()
+
+
 class OpenEventListener:
 
     def __init__(self, *args, **kwargs):
         self.session: Session
+        # check session ready without creating it
+        self.is_session_ready: Callable[[], bool]
         self.prev_completion_point = 0
+        # last activated view id and activation time
+        self._last_activation: Tuple[int, float] = (0, 0.0)
 
     def _on_activated_async(self, view: sublime.View):
+        # Ignore output panel, widget and scratch view early. Any view
+        # activation trigger this event.
+        if view.element() is not None or view.is_scratch():
+            return
+
+        # Same view activated again in short time, e.g. focus moved to
+        # other window and back. Nothing changed since last activation.
+        now = time.monotonic()
+        view_id, activated_at = self._last_activation
+        self._last_activation = (view.id(), now)
+        if view_id == view.id() and now - activated_at < REACTIVATION_IGNORE_WINDOW:
+            return
+
         # check point in valid source
         if not is_valid_document(view):
             return
@@ -39,32 +159,60 @@ class OpenEventListener:
         if LOGGER.level == logging.DEBUG:
             return
 
-        # initialize server
-        initialize_server(self.session, view)
-        self.session.textdocument_didopen(view)
+        # View activated repeatedly while server starting, e.g. switching tabs.
+        # Only one initializer run for each view at a time.
+        with _INITIALIZING_VIEWS_LOCK:
+            if view.id() in _INITIALIZING_VIEWS:
+                return
+            _INITIALIZING_VIEWS.add(view.id())
 
-    def _on_load(self, view: sublime.View):
-        # check point in valid source
-        if not is_valid_document(view):
+        try:
+            # session may be ready while waiting lock
+            if self.session.is_ready():
+                self.session.textdocument_didopen(view)
+                return
+
+            # initialize server
+            initialize_server(self.session, view)
+            # Opened by session once initialized instead of blocking async
+            # worker until initialized. Called after 'initialize_server()'
+            # because running server reset session state.
+            self.session.textdocument_didopen_when_initialized(view)
+        finally:
+            with _INITIALIZING_VIEWS_LOCK:
+                _INITIALIZING_VIEWS.discard(view.id())
+
+    def _on_load_async(self, view: sublime.View):
+        invalidate_document_validity(view)
+
+        # don't create session if not created yet
+        if not self.is_session_ready():
             return
 
-        if self.session.is_ready():
+        # check point in valid source
+        if is_valid_document(view):
             self.session.textdocument_didopen(view, reload=True)
 
-    def _on_reload(self, view: sublime.View):
-        # check point in valid source
-        if not is_valid_document(view):
+    def _on_reload_async(self, view: sublime.View):
+        invalidate_document_validity(view)
+
+        # don't create session if not created yet
+        if not self.is_session_ready():
             return
 
-        if self.session.is_ready():
+        # check point in valid source
+        if is_valid_document(view):
             self.session.textdocument_didopen(view, reload=True)
 
-    def _on_revert(self, view: sublime.View):
-        # check point in valid source
-        if not is_valid_document(view):
+    def _on_revert_async(self, view: sublime.View):
+        invalidate_document_validity(view)
+
+        # don't create session if not created yet
+        if not self.is_session_ready():
             return
 
-        if self.session.is_ready():
+        # check point in valid source
+        if is_valid_document(view):
             self.session.textdocument_didopen(view, reload=True)
 
 
@@ -72,14 +220,20 @@ class SaveEventListener:
 
     def __init__(self, *args, **kwargs):
         self.session: Session
+        # check session ready without creating it
+        self.is_session_ready: Callable[[], bool]
         self.prev_completion_point = 0
 
     def _on_post_save_async(self, view: sublime.View):
-        # check point in valid source
-        if not is_valid_document(view):
+        invalidate_document_validity(view)
+        COMPLETION_CACHE.clear(view.buffer_id())
+
+        # don't create session if not created yet
+        if not self.is_session_ready():
             return
 
-        if self.session.is_ready():
+        # check point in valid source
+        if is_valid_document(view):
             self.session.textdocument_didsave(view)
 
 
@@ -87,34 +241,101 @@ class CloseEventListener:
 
     def __init__(self, *args, **kwargs):
         self.session: Session
+        # check session ready without creating it
+        self.is_session_ready: Callable[[], bool]
         self.prev_completion_point = 0
 
     def _on_close(self, view: sublime.View):
         # check point in valid source
-        if not is_valid_document(view):
-            return
+        # don't create session if not created yet
+        should_close = self.is_session_ready() and is_valid_document(view)
+        # view closed, release cached validity
+        invalidate_document_validity(view)
+        COMPLETION_CACHE.clear(view.buffer_id())
 
-        if self.session.is_ready():
+        if should_close:
             self.session.textdocument_didclose(view)
 
 
+def merge_insertions(changes: List[TextChange]) -> List[TextChange]:
+    """merge contiguous single line insertions, e.g. typed characters"""
+    merged: List[TextChange] = []
+    for change in changes:
+        if (
+            merged
+            and change.start == change.end
+            and (prev := merged[-1]).start == prev.end
+            and "\n" not in prev.text
+            and change.start.row == prev.start.row
+            and change.start.column == prev.start.column + len(prev.text)
+        ):
+            merged[-1] = TextChange(prev.start, prev.end, prev.text + change.text, 0)
+            continue
+
+        merged.append(change)
+
+    return merged
+
+
+_PENDING_TEXT_CHANGES: Dict[int, Callable[[], None]] = {}
+"""pending text changes flush function mapped by buffer id"""
+
+
+def flush_text_changes(view: sublime.View) -> None:
+    """send pending text changes of view buffer now, must be called from the
+    main thread.
+
+    Call before request which result depend on document state, e.g. formatting.
+    """
+    if flush := _PENDING_TEXT_CHANGES.pop(view.buffer_id(), None):
+        flush()
+
+
 class TextChangeListener:
 
+    # '__init__()' not called by 'sublime_plugin.TextChangeListener'
+    _pending_changes: List[TextChange]
+    _flush_scheduled = False
+
     def __init__(self, *args, **kwargs):
         self.buffer: sublime.Buffer
         self.session: Session
 
     def _on_text_changed(self, changes: List[sublime.TextChange]):
-        view = self.buffer.primary_view()
+        if not self.session.is_ready():
+            # changes not sent to server, cached completion is outdated
+            COMPLETION_CACHE.clear(self.buffer.id())
+            return
 
         # check point in valid source
-        if not is_valid_document(view):
+        view = self.buffer.primary_view()
+        if is_valid_document(view):
+            text_changes = [self.to_text_change(c) for c in changes]
+            COMPLETION_CACHE.invalidate(self.buffer.id(), text_changes)
+
+            # Changes in short window sent in single notification.
+            # Flushed in main thread, so document version match the changes.
+            if not self._flush_scheduled:
+                self._pending_changes = []
+                self._flush_scheduled = True
+                _PENDING_TEXT_CHANGES[self.buffer.id()] = self._flush_changes
+                sublime.set_timeout(self._flush_changes, TEXT_CHANGE_FLUSH_DELAY)
+
+            self._pending_changes.extend(text_changes)
+
+    def _flush_changes(self):
+        # already flushed by 'flush_text_changes()'
+        if not self._flush_scheduled:
             return
 
-        if self.session.is_ready():
-            self.session.textdocument_didchange(
-                view, [self.to_text_change(c) for c in changes]
-            )
+        self._flush_scheduled = False
+        _PENDING_TEXT_CHANGES.pop(self.buffer.id(), None)
+        changes = merge_insertions(self._pending_changes)
+        self._pending_changes = []
+
+        view = self.buffer.primary_view()
+        if view and self.session.is_ready():
+            self.session.textdocument_didchange(view, changes)
 
     @staticmethod
     def to_text_change(change: sublime.TextChange) -> TextChange:
@@ -129,6 +350,10 @@ class CompletionEventListener:
     def __init__(self, *args, **kwargs):
         self.session: Session
         self.prev_completion_point = 0
+        self._completion_request_count = 0
+        self._signature_help_request_count = 0
+        self._completion_cache_key: CacheKey = None
+        self._completion_cache_prefix = ""
 
     def _is_context_changed(self, view: sublime.View, point: int) -> bool:
         """"""
@@ -148,12 +373,22 @@ class CompletionEventListener:
         if not self.session.is_ready():
             return None
 
+        if not locations:
+            return None
+
         point = locations[0]
 
         # check point in valid source
         if not is_valid_document(view):
             return None
 
+        # nothing useful to complete inside comment, and inside string
+        # only if user typed something, e.g. dictionary key or path
+        if view.match_selector(point, COMMENT_SELECTOR) or (
+            not prefix and view.match_selector(point, STRING_SELECTOR)
+        ):
+            return None
+
         if (
             document := self.session.action_target_map.get("textDocument/completion")
         ) and document.is_completion_available():
@@ -163,41 +398,127 @@ class CompletionEventListener:
                 document.hide_completion()
                 return
 
+            COMPLETION_CACHE.set(
+                self._completion_cache_key, self._completion_cache_prefix, items
+            )
             return sublime.CompletionList(items, flags=sublime.INHIBIT_WORD_COMPLETIONS)
 
+        row, col = view.rowcol(point)
+        # prefix is word before point, it doesn't contain newline
+        cache_key = (view.buffer_id(), row, col - len(prefix))
+        if items := COMPLETION_CACHE.get(cache_key, prefix):
+            # Sublime Text filter the items too, only reduce the items passed
+            if prefix:
+                items = [item for item in items if fuzzy_match(prefix, item.trigger)]
+            # nothing matched, ask server instead of hiding word completions
+            if items:
+                return sublime.CompletionList(
+                    items, flags=sublime.INHIBIT_WORD_COMPLETIONS
+                )
+
         self.prev_completion_point = point
+        self._completion_cache_key = cache_key
+        self._completion_cache_prefix = prefix
 
-        row, col = view.rowcol(point)
-        self.session.textdocument_completion(view, row, col)
+        flush_text_changes(view)
+        self._request_completion(view, row, col)
         view.run_command("hide_auto_complete")
 
         # Use timeout because of slowdown in completion request
-        sublime.set_timeout_async(self.show_signature_help(view, point), 0.5)
+        self._request_signature_help(view, point)
         return None
 
+    def _request_completion(self, view: sublime.View, row: int, col: int):
+        # Debounce request, only latest request sent while user typing.
+        self._completion_request_count += 1
+        request_count = self._completion_request_count
+
+        def request_completion():
+            if request_count == self._completion_request_count:
+                self.session.textdocument_completion(view, row, col)
+
+        sublime.set_timeout_async(request_completion, COMPLETION_REQUEST_DELAY)
+
+    def _request_signature_help(self, view: sublime.View, point: int):
+        # Debounce request, only latest request sent while user typing.
+        self._signature_help_request_count += 1
+        request_count = self._signature_help_request_count
+
+        def request_signature_help():
+            if request_count == self._signature_help_request_count:
+                self.show_signature_help(view, point)
+
+        # Run in main thread, the command flush pending text changes which
+        # only safe in main thread.
+        sublime.set_timeout(request_signature_help, SIGNATUREHELP_REQUEST_DELAY)
+
     def show_signature_help(self, view: sublime.View, point: int):
-        view.run_command(f"{COMMAND_PREFIX}_document_signature_help", {"point": point})
+        view.run_command(DOCUMENT_SIGNATURE_HELP_COMMAND, {"point": point})
+
+
+_HOVER_EXECUTOR: Optional[ThreadPoolExecutor] = None
+"""shared hover worker, reused instead of spawning thread on every hover"""
+_HOVER_EXECUTOR_LOCK = threading.Lock()
+
+
+def get_hover_executor() -> ThreadPoolExecutor:
+    """get hover executor, create if not created or has been shut down"""
+    global _HOVER_EXECUTOR
+    with _HOVER_EXECUTOR_LOCK:
+        if _HOVER_EXECUTOR is None:
+            _HOVER_EXECUTOR = ThreadPoolExecutor(
+                max_workers=2, thread_name_prefix="hover"
+            )
+        return _HOVER_EXECUTOR
+
+
+def shutdown_hover_executor() -> None:
+    """shutdown hover executor without waiting pending hover"""
+    global _HOVER_EXECUTOR
+    with _HOVER_EXECUTOR_LOCK:
+        if _HOVER_EXECUTOR:
+            _HOVER_EXECUTOR.shutdown(wait=False)
+            # this module not reimported on plugin reload, next hover
+            # create new executor
+            _HOVER_EXECUTOR = None
 
 
 class HoverEventListener:
 
     def __init__(self, *args, **kwargs):
         self.session: Session
+        self._hover_future: Optional[Future] = None
+        self._hover_request_count = 0
 
     def _on_hover(self, view: sublime.View, point: int, hover_zone: HoverZone):
         # check point in valid source
         if not (is_valid_document(view) and hover_zone == sublime.HOVER_TEXT):
             return
 
+        # previous hover not started yet, cancel it
+        if self._hover_future:
+            self._hover_future.cancel()
+
+        self._hover_request_count += 1
         row, col = view.rowcol(point)
-        threading.Thread(target=self._on_hover_task, args=(view, row, col)).start()
+        flush_text_changes(view)
+        self._hover_future = get_hover_executor().submit(
+            self._on_hover_task, view, row, col, self._hover_request_count
+        )
+
+    def _on_hover_task(
+        self, view: sublime.View, row: int, col: int, request_count: int
+    ):
+        # ignore if newer hover triggered
+        if request_count != self._hover_request_count:
+            return
 
-    def _on_hover_task(self, view: sublime.View, row: int, col: int):
         if not self.session.is_ready():
             initialize_server(self.session, view)
 
         self.session.textdocument_didopen(view)
-        self.session.textdocument_hover(view, row, col)
+        if request_count == self._hover_request_count:
+            self.session.textdocument_hover(view, row, col)
 
 
 class DocumentSignatureHelpCommand:
@@ -217,10 +538,11 @@ class DocumentSignatureHelpCommand:
             self.prev_trigger_word = self.view.word(point)
 
             # Only request signature on function arguments
-            if not self.view.match_selector(point, "meta.function-call.arguments"):
+            if not self.view.match_selector(point, SIGNATUREHELP_SELECTOR):
                 return
 
             row, col = self.view.rowcol(point)
+            flush_text_changes(self.view)
             self.session.textdocument_signaturehelp(self.view, row, col)
 
 
@@ -232,6 +554,7 @@ class DocumentFormattingCommand:
 
     def _run(self, edit: sublime.Edit):
         if self.session.is_ready():
+            flush_text_changes(self.view)
             self.session.textdocument_formatting(self.view)
 
 
@@ -262,6 +585,7 @@ class GotoDefinitionCommand:
             row, column = self.view.rowcol(self.view.sel()[0].a)
 
         if self.session.is_ready():
+            flush_text_changes(self.view)
             self.session.textdocument_definition(self.view, row, column)
 
 
@@ -280,6 +604,7 @@ class PrepareRenameCommand:
             self.view.sel().add(point)
 
             start_row, start_col = self.view.rowcol(point)
+            flush_text_changes(self.view)
             self.session.textdocument_preparerename(self.view, start_row, start_col)
 
 
@@ -291,24 +616,10 @@ class RenameCommand:
 
     def _run(self, edit: sublime.Edit, row: int, column: int, new_name: str):
         if self.session.is_ready():
+            flush_text_changes(self.view)
             self.session.textdocument_rename(self.view, row, column, new_name)
 
 
-class _BufferedTextChange:
-    __slots__ = ["region", "old_text", "new_text"]
-
-    def __init__(self, region: sublime.Region, old_text: str, new_text: str) -> None:
-        self.region = region
-        self.old_text = old_text
-        self.new_text = new_text
-
-    def offset_move(self) -> int:
-        return len(self.new_text) - len(self.old_text)
-
-    def get_moved_region(self, move: int) -> sublime.Region:
-        return sublime.Region(self.region.a + move, self.region.b + move)
-
-
 class ApplyTextChangesCommand:
     """changes item must serialized from 'TextChange'"""
 
@@ -316,42 +627,73 @@ class ApplyTextChangesCommand:
         self.view: sublime.View
 
     def _run(self, edit: sublime.Edit, changes: List[dict]):
-        text_changes = [self.to_text_change(c) for c in changes]
-        active_selection = list(self.view.sel())
-
-        self.apply(edit, text_changes)
-        self.relocate_selection(active_selection, text_changes)
-
-    def apply(self, edit: sublime.Edit, text_changes: List[_BufferedTextChange]):
-        move = 0
-        for change in text_changes:
-            replaced_region = change.get_moved_region(move)
-            self.view.replace(edit, replaced_region, change.new_text)
-            move += change.offset_move()
-
-    def to_text_change(self, change: dict) -> _BufferedTextChange:
-        change = TextChange(**change)
+        if not changes:
+            return
 
-        start = self.view.text_point(*change.start)
-        end = self.view.text_point(*change.end)
-        region = sublime.Region(start, end)
-        old_text = self.view.substr(region)
+        regions, new_texts, moves = self._build_arrays(changes)
+        active_selection = list(self.view.sel())
 
-        return _BufferedTextChange(region, old_text, change.text)
+        self.apply(edit, regions, new_texts)
+        self.relocate_selection(active_selection, regions, moves)
+
+    def _build_arrays(
+        self, changes: List[dict]
+    ) -> Tuple[List[sublime.Region], List[str], List[int]]:
+        """build changes region, new text and offset move as separated list
+        sorted by region
+        """
+        items = []
+        # Each API call is a round trip to Sublime Text. Changes commonly
+        # start and end in the same line, e.g. rename, so cache line start.
+        line_starts: Dict[int, int] = {}
+
+        def text_point(row: int, column: int) -> int:
+            try:
+                return line_starts[row] + column
+            except KeyError:
+                line_starts[row] = self.view.text_point(row, 0)
+                return line_starts[row] + column
+
+        for change in changes:
+            start = text_point(*change["start"])
+            end = text_point(*change["end"])
+            items.append((start, end, change["text"]))
+
+        # stable sort keeps insertions at the same point in their given order
+        items.sort(key=lambda item: (item[0], item[1]))
+
+        regions = [sublime.Region(start, end) for start, end, _ in items]
+        new_texts = [text for _, _, text in items]
+        moves = [len(text) - (end - start) for start, end, text in items]
+        return regions, new_texts, moves
+
+    def apply(
+        self, edit: sublime.Edit, regions: List[sublime.Region], new_texts: List[str]
+    ):
+        """apply non overlapping text changes sorted by region"""
+        # apply from the end of document, so applied change doesn't move
+        # region of the next changes
+        for region, new_text in zip(reversed(regions), reversed(new_texts)):
+            self.view.replace(edit, region, new_text)
 
     def relocate_selection(
-        self, selections: List[sublime.Region], changes: List[_BufferedTextChange]
+        self,
+        selections: List[sublime.Region],
+        regions: List[sublime.Region],
+        moves: List[int],
     ):
-        """relocate current selection following text changes"""
+        """relocate current selection following text changes sorted by region"""
+        begins = [region.begin() for region in regions]
+        # cumulative moves, total_moves[i] is total move of first 'i' changes
+        total_moves = list(accumulate(moves, initial=0))
+
         moved_selections = []
         for selection in selections:
-            temp_selection = selection
-            for change in changes:
-                if temp_selection.begin() > change.region.begin():
-                    temp_selection.a += change.offset_move()
-                    temp_selection.b += change.offset_move()
-
-            moved_selections.append(temp_selection)
+            # selection moved by changes begin before it
+            move = total_moves[bisect_left(begins, selection.begin())]
+            moved_selections.append(
+                sublime.Region(selection.a + move, selection.b + move)
+            )
 
         # we must clear current selection
         self.view.sel().clear()
@@ -2,9 +2,11 @@
 
 import logging
 import threading
+import time
 
 from collections import namedtuple
 from dataclasses import dataclass
+from enum import IntEnum
 from functools import wraps
 from html import escape as escape_html
 from pathlib import Path
@@ -13,9 +15,10 @@ from typing import Optional, Dict, List, Callable
 import sublime
 
 from .constant import (
-    COMMAND_PREFIX,
     LOGGING_CHANNEL,
     PACKAGE_NAME,
+    RENAME_COMMAND,
+    SET_ENVIRONMENT_COMMAND,
 )
 from .document import (
     BufferedDocument,
@@ -38,7 +41,7 @@ from .session import (
     open_location,
     PathEncodedStr,
 )
-from .sublime_settings import Settings
+from .sublime_settings import get_settings
 from .workspace import (
     Workspace,
     get_workspace_path,
@@ -52,11 +55,39 @@ LineCharacter = namedtuple("LineCharacter", ["line", "character"])
 """Line Character namedtuple"""
 
 
+class TextDocumentSyncKind(IntEnum):
+    NONE = 0
+    FULL = 1
+    INCREMENTAL = 2
+
+
+def get_text_sync_kind(initialize_result: dict) -> TextDocumentSyncKind:
+    """get text document sync kind from server capabilities.
+
+    Assume incremental if server not define it, either 'textDocumentSync'
+    or its 'change' option. The specification default is NONE, but this
+    plugin always sent incremental changes before sync kind supported,
+    so servers which omit it keep working.
+    """
+    default = TextDocumentSyncKind.INCREMENTAL
+    capabilities = (initialize_result or {}).get("capabilities", {})
+    sync = capabilities.get("textDocumentSync", default)
+    # 'textDocumentSync' may defined as 'TextDocumentSyncOptions'
+    if isinstance(sync, dict):
+        sync = sync.get("change", default)
+
+    try:
+        return TextDocumentSyncKind(sync)
+    except ValueError:
+        return default
+
+
 class InitializeManager:
     """"""
 
-    def __init__(self):
+    def __init__(self, wait_timeout: float = 12.5):
         self.initialize_event = threading.Event()
+        self.wait_timeout = wait_timeout
         self._is_initializing = False
         self._is_initialized = False
 
@@ -105,7 +136,11 @@ class InitializeManager:
 
         @wraps(func)
         def wrapper(*args, **kwargs):
-            self.initialize_event.wait()
+            # don't block caller thread forever if initialize failed
+            if not self.initialize_event.wait(self.wait_timeout):
+                LOGGER.debug("wait initialize timeout, '%s' ignored", func.__name__)
+                return None
+
             return func(*args, **kwargs)
 
         return wrapper
@@ -128,12 +163,20 @@ class PyserverSession(Session):
 
         # workspace status
         self.workspace = Workspace()
+        self.text_sync_kind = TextDocumentSyncKind.INCREMENTAL
+
+        # views opened once server initialized, mapped by view id
+        self._pending_open_views: Dict[int, sublime.View] = {}
+        self._pending_open_lock = threading.Lock()
 
     def _reset_state(self) -> None:
+        with self._pending_open_lock:
+            self._pending_open_views.clear()
         self.workspace.reset()
         self.action_target_map.clear()
         self.initialize_manager.reset()
         self.diagnostic_manager.reset()
+        self.text_sync_kind = TextDocumentSyncKind.INCREMENTAL
 
     def _set_default_handler(self):
         default_handlers = {
@@ -157,8 +200,9 @@ class PyserverSession(Session):
         self.handler_map.update(default_handlers)
 
     def _is_ready(self) -> bool:
+        # check flag first, 'is_server_running()' poll the process
         return (
-            self.client.is_server_running() and self.initialize_manager.is_initialized()
+            self.initialize_manager.is_initialized() and self.client.is_server_running()
         )
 
     def _terminate(self):
@@ -200,8 +244,18 @@ class PyserverSession(Session):
             print(err["message"])
             return
 
+        self.text_sync_kind = get_text_sync_kind(params.result)
         self.client.send_notification("initialized", {})
-        self.initialize_manager.initialize()
+
+        # set initialized and take pending views at once, so view added
+        # concurrently is either pending here or opened immediately
+        with self._pending_open_lock:
+            self.initialize_manager.initialize()
+            pending_views = list(self._pending_open_views.values())
+            self._pending_open_views.clear()
+
+        for view in pending_views:
+            self.textdocument_didopen(view)
 
     def handle_window_logmessage(self, params: dict):
         print(params["message"])
@@ -245,9 +299,24 @@ class PyserverSession(Session):
                 },
             )
 
+    def textdocument_didopen_when_initialized(self, view: sublime.View):
+        """open document now if initialized, else once initialized"""
+        with self._pending_open_lock:
+            if not self.initialize_manager.is_initialized():
+                self._pending_open_views[view.id()] = view
+                return
+
+        self.textdocument_didopen(view)
+
     @initialize_manager.must_initialized
     def textdocument_didsave(self, view: sublime.View):
-        if document := self.workspace.get_document(view):
+        if (document := self.workspace.get_document(view)) and (
+            document.file_name != view.file_name()
+        ):
+            # saved as other file, close older name and open with new name
+            self.textdocument_didopen(view)
+
+        elif document:
             self.client.send_notification(
                 "textDocument/didSave",
                 {"textDocument": {"uri": path_to_uri(document.file_name)}},
@@ -259,14 +328,14 @@ class PyserverSession(Session):
 
     @initialize_manager.must_initialized
     def textdocument_didclose(self, view: sublime.View):
-        file_name = view.file_name()
         self.diagnostic_manager.remove(view)
 
         if document := self.workspace.get_document(view):
             self.workspace.remove_document(view)
 
-            # if document still opened in other View
-            if self.workspace.get_documents(file_name):
+            # If document still opened in other View. Use document name,
+            # view may be renamed after document opened.
+            if self.workspace.get_documents(document.file_name):
                 return
 
             self.client.send_notification(
@@ -274,17 +343,28 @@ class PyserverSession(Session):
                 {"textDocument": {"uri": path_to_uri(document.file_name)}},
             )
 
-    @initialize_manager.must_initialized
     def textdocument_didchange(self, view: sublime.View, changes: List[TextChange]):
+        # Called on every edit, check inline instead of 'must_initialized'
+        if not self.initialize_manager.is_initialized():
+            return
+
         # Document can be related to multiple View but has same file_name.
         # Use get_document_by_name() because may be document already open
         # in other view and the argument view not assigned.
         file_name = view.file_name()
+        if self.text_sync_kind == TextDocumentSyncKind.NONE:
+            return
+
         if document := self.workspace.get_document_by_name(file_name):
+            if self.text_sync_kind == TextDocumentSyncKind.FULL:
+                content_changes = [{"text": document.text}]
+            else:
+                content_changes = list(map(textchange_to_rpc, changes))
+
             self.client.send_notification(
                 "textDocument/didChange",
                 {
-                    "contentChanges": [textchange_to_rpc(c) for c in changes],
+                    "contentChanges": content_changes,
                     "textDocument": {
                         "uri": path_to_uri(document.file_name),
                         "version": document.version,
@@ -340,8 +420,11 @@ class PyserverSession(Session):
             row, col = LineCharacter(**result["range"]["start"])
             self.action_target_map[method].show_popup(message, row, col)
 
-    @initialize_manager.must_initialized
     def textdocument_completion(self, view, row, col):
+        # Called while typing, check inline instead of 'must_initialized'
+        if not self.initialize_manager.is_initialized():
+            return
+
         method = "textDocument/completion"
         if document := self.workspace.get_document(view):
             self.action_target_map[method] = document
@@ -376,7 +459,7 @@ class PyserverSession(Session):
         if err := params.error:
             print(err["message"])
 
-        elif result := params.result:
+        elif (result := params.result) and result["items"]:
             items = [self._build_completion(item) for item in result["items"]]
             self.action_target_map[method].show_completion(items)
 
@@ -531,7 +614,7 @@ class PyserverSession(Session):
         def request_rename(new_name):
             if new_name and old_name != new_name:
                 view.run_command(
-                    f"{COMMAND_PREFIX}_rename",
+                    RENAME_COMMAND,
                     {"row": row, "column": col, "new_name": new_name},
                 )
 
@@ -552,12 +635,14 @@ class PyserverSession(Session):
 
 def textchange_to_rpc(text_change: TextChange) -> dict:
     """"""
-    start = text_change.start
-    end = text_change.end
+    # called for each changes on every edit, unpacking tuple is cheaper than
+    # accessing its fields by name
+    start_row, start_column = text_change.start
+    end_row, end_column = text_change.end
     return {
         "range": {
-            "end": {"character": end.column, "line": end.row},
-            "start": {"character": start.column, "line": start.row},
+            "end": {"character": end_column, "line": end_row},
+            "start": {"character": start_column, "line": start_row},
         },
         "rangeLength": text_change.length,
         "text": text_change.text,
@@ -613,7 +698,7 @@ class DiagnosticManager:
         self._active_view = None
         self._active_view_diagnostics = []
         self.panel.destroy()
-        self.diagnostics = {}
+        self.diagnostics.clear()
 
     def get(self, view: sublime.View) -> List[dict]:
         with self._change_lock:
@@ -621,17 +706,18 @@ class DiagnosticManager:
 
     def set(self, view: sublime.View, diagostics: List[dict]):
         with self._change_lock:
-            self.diagnostics.update({view: diagostics})
+            self.diagnostics[view] = diagostics
             self._on_diagnostic_changed(view)
 
     def remove(self, view: sublime.View):
         with self._change_lock:
-            try:
-                del self.diagnostics[view]
-            except KeyError:
-                pass
+            self.diagnostics.pop(view, None)
             self._on_diagnostic_changed(view)
 
+            # don't keep reference to closed view
+            if view == self._active_view:
+                self._active_view = None
+
     def set_active_view(self, view: sublime.View):
         if view == self._active_view:
             return
@@ -734,9 +820,10 @@ class WorkspaceEdit:
         edits = document_changes["edits"]
         changes = [rpc_to_textchange(c) for c in edits]
 
-        document = self.workspace.get_document_by_name(
-            file_name, UnbufferedDocument(file_name)
-        )
+        document = self.workspace.get_document_by_name(file_name)
+        if not document:
+            # document not opened, edit file directly
+            document = UnbufferedDocument(file_name)
         document.apply_changes(changes)
         document.save()
 
@@ -754,12 +841,15 @@ class WorkspaceEdit:
         file_name = uri_to_path(document_changes["uri"])
         create_document(file_name)
 
-    @staticmethod
-    def _rename_document(document_changes: dict):
+    def _rename_document(self, document_changes: dict):
         old_name = uri_to_path(document_changes["oldUri"])
         new_name = uri_to_path(document_changes["newUri"])
         rename_document(old_name, new_name)
 
+        # renamed views retargeted, index documents with the new name
+        for document in self.workspace.get_documents(old_name):
+            self.workspace.update_document_name(document.view)
+
     @staticmethod
     def _delete_document(document_changes: dict):
         file_name = uri_to_path(document_changes["uri"])
@@ -776,12 +866,25 @@ def get_session() -> Session:
     return PyserverSession(transport)
 
 
+SET_ENVIRONMENT_INTERVAL = 5.0
+"""minimum interval in seconds between set environment prompts"""
+_set_environment_after = 0.0
+_set_environment_lock = threading.Lock()
+
+
 def get_envs_settings() -> Optional[dict]:
     """get environments defined in '*.sublime-settings'"""
 
-    with Settings() as settings:
-        if envs := settings.get("envs"):
-            return envs
+    if envs := get_settings("envs"):
+        return envs
 
-        sublime.active_window().run_command("pythontools_set_environment")
-        return None
+    # Prevent multiple views activated at once prompt set environment.
+    global _set_environment_after
+    with _set_environment_lock:
+        now = time.monotonic()
+        if now < _set_environment_after:
+            return None
+        _set_environment_after = now + SET_ENVIRONMENT_INTERVAL
+
+    sublime.active_window().run_command(SET_ENVIRONMENT_COMMAND)
+    return None
@@ -2,13 +2,11 @@
 
 import threading
 from abc import ABC, abstractmethod
-from collections import defaultdict
-from dataclasses import asdict
-from typing import Optional, List, Dict, Callable, Any, Union
+from typing import Optional, List, Dict, Callable, Any, Tuple, Union
 
 import sublime
 
-from .constant import PACKAGE_NAME, COMMAND_PREFIX
+from .constant import PACKAGE_NAME, APPLY_TEXT_CHANGES_COMMAND
 from .document import TextChange
 from .lsp_client import Client, Handler, Transport, MethodName, Response
 from .errors import MethodNotFound
@@ -20,41 +18,38 @@ Params = Union[Response, dict]
 HandlerFunction = Callable[[str, Params], Any]
 
 
-COMPLETION_KIND_MAP = defaultdict(
-    lambda _: sublime.KIND_AMBIGUOUS,
-    {
-        1: (sublime.KindId.COLOR_ORANGISH, "t", ""),  # text
-        2: (sublime.KindId.FUNCTION, "", ""),  # method
-        3: (sublime.KindId.FUNCTION, "", ""),  # function
-        4: (sublime.KindId.FUNCTION, "c", ""),  # constructor
-        5: (sublime.KindId.VARIABLE, "", ""),  # field
-        6: (sublime.KindId.VARIABLE, "", ""),  # variable
-        7: (sublime.KindId.TYPE, "", ""),  # class
-        8: (sublime.KindId.TYPE, "", ""),  # interface
-        9: (sublime.KindId.NAMESPACE, "", ""),  # module
-        10: (sublime.KindId.VARIABLE, "", ""),  # property
-        11: (sublime.KindId.TYPE, "", ""),  # unit
-        12: (sublime.KindId.COLOR_ORANGISH, "v", ""),  # value
-        13: (sublime.KindId.TYPE, "", ""),  # enum
-        14: (sublime.KindId.KEYWORD, "", ""),  # keyword
-        15: (sublime.KindId.SNIPPET, "s", ""),  # snippet
-        16: (sublime.KindId.VARIABLE, "v", ""),  # color
-        17: (sublime.KindId.VARIABLE, "p", ""),  # file
-        18: (sublime.KindId.VARIABLE, "p", ""),  # reference
-        19: (sublime.KindId.VARIABLE, "p", ""),  # folder
-        20: (sublime.KindId.VARIABLE, "v", ""),  # enum member
-        21: (sublime.KindId.VARIABLE, "c", ""),  # constant
-        22: (sublime.KindId.TYPE, "", ""),  # struct
-        23: (sublime.KindId.TYPE, "e", ""),  # event
-        24: (sublime.KindId.KEYWORD, "", ""),  # operator
-        25: (sublime.KindId.TYPE, "", ""),  # type parameter
-    },
-)
+COMPLETION_KIND_MAP = {
+    1: (sublime.KindId.COLOR_ORANGISH, "t", ""),  # text
+    2: (sublime.KindId.FUNCTION, "", ""),  # method
+    3: (sublime.KindId.FUNCTION, "", ""),  # function
+    4: (sublime.KindId.FUNCTION, "c", ""),  # constructor
+    5: (sublime.KindId.VARIABLE, "", ""),  # field
+    6: (sublime.KindId.VARIABLE, "", ""),  # variable
+    7: (sublime.KindId.TYPE, "", ""),  # class
+    8: (sublime.KindId.TYPE, "", ""),  # interface
+    9: (sublime.KindId.NAMESPACE, "", ""),  # module
+    10: (sublime.KindId.VARIABLE, "", ""),  # property
+    11: (sublime.KindId.TYPE, "", ""),  # unit
+    12: (sublime.KindId.COLOR_ORANGISH, "v", ""),  # value
+    13: (sublime.KindId.TYPE, "", ""),  # enum
+    14: (sublime.KindId.KEYWORD, "", ""),  # keyword
+    15: (sublime.KindId.SNIPPET, "s", ""),  # snippet
+    16: (sublime.KindId.VARIABLE, "v", ""),  # color
+    17: (sublime.KindId.VARIABLE, "p", ""),  # file
+    18: (sublime.KindId.VARIABLE, "p", ""),  # reference
+    19: (sublime.KindId.VARIABLE, "p", ""),  # folder
+    20: (sublime.KindId.VARIABLE, "v", ""),  # enum member
+    21: (sublime.KindId.VARIABLE, "c", ""),  # constant
+    22: (sublime.KindId.TYPE, "", ""),  # struct
+    23: (sublime.KindId.TYPE, "e", ""),  # event
+    24: (sublime.KindId.KEYWORD, "", ""),  # operator
+    25: (sublime.KindId.TYPE, "", ""),  # type parameter
+}
 
 
 def get_completion_kind(lsp_kind: int) -> int:
     """"""
-    return COMPLETION_KIND_MAP[lsp_kind]
+    return COMPLETION_KIND_MAP.get(lsp_kind, sublime.KIND_AMBIGUOUS)
 
 
 class DiagnosticPanel:
@@ -78,8 +73,8 @@ class DiagnosticPanel:
 
         change = TextChange(start, end, text, -1)
         self.panel.run_command(
-            f"{COMMAND_PREFIX}_apply_text_changes",
-            {"changes": [asdict(change)]},
+            APPLY_TEXT_CHANGES_COMMAND,
+            {"changes": [change.to_dict()]},
         )
 
     def show(self) -> None:
@@ -105,6 +100,8 @@ class Command(ABC):
         self, view: sublime.View, *, reload: bool = False
     ) -> None: ...
     @abstractmethod
+    def textdocument_didopen_when_initialized(self, view: sublime.View) -> None: ...
+    @abstractmethod
     def textdocument_didsave(self, view: sublime.View) -> None: ...
     @abstractmethod
     def textdocument_didclose(self, view: sublime.View) -> None: ...
@@ -190,12 +187,18 @@ def set_selection(view: sublime.View, regions: List[sublime.Region]):
     view.sel().add_all(regions)
 
 
+def _location_sort_key(location: PathEncodedStr) -> Tuple[str, int, int]:
+    # file name may contain ':', e.g. drive letter on Windows
+    file_name, row, column = location.rsplit(":", 2)
+    return (file_name, int(row), int(column))
+
+
 def open_location(current_view: sublime.View, locations: List[PathEncodedStr]) -> None:
     """"""
     current_selections = list(current_view.sel())
     current_visible_region = current_view.visible_region()
 
-    locations = sorted(locations)
+    locations = sorted(locations, key=_location_sort_key)
 
     def open_location(index):
         if index >= 0:
@@ -1,9 +1,11 @@
 """sublime settings helper"""
 
+import threading
 from contextlib import contextmanager
+from typing import Any, Dict, Tuple
 import sublime
 
-from .constant import SETTINGS_BASENAME
+from .constant import PACKAGE_NAME, SETTINGS_BASENAME
 
 @contextmanager
 def Settings(
@@ -14,3 +16,45 @@ def Settings(
     yield sublime.load_settings(base_name)
     if save:
         sublime.save_settings(base_name)
+
+
+_CACHED_VALUES: Dict[Tuple[str, str], Any] = {}
+"""settings value mapped by (base_name, key)"""
+_CACHE_LOCK = threading.RLock()
+_ON_CHANGE_KEY = f"{PACKAGE_NAME}_settings_cache"
+
+
+def get_settings(
+    key: str, default: Any = None, *, base_name: str = SETTINGS_BASENAME
+) -> Any:
+    """get settings value, cached until settings changed"""
+
+    cache_key = (base_name, key)
+    # Load and store while holding lock, so cache cleared by settings changed
+    # never overwritten by older value.
+    with _CACHE_LOCK:
+        try:
+            return _CACHED_VALUES[cache_key]
+        except KeyError:
+            pass
+
+        settings = sublime.load_settings(base_name)
+        value = settings.get(key, default)
+
+        if not any(k[0] == base_name for k in _CACHED_VALUES):
+            # register once for each settings file
+            settings.clear_on_change(_ON_CHANGE_KEY)
+            settings.add_on_change(
+                _ON_CHANGE_KEY, lambda: clear_settings_cache(base_name)
+            )
+        _CACHED_VALUES[cache_key] = value
+
+    return value
+
+
+def clear_settings_cache(base_name: str = SETTINGS_BASENAME) -> None:
+    """clear cached values of settings file"""
+
+    with _CACHE_LOCK:
+        for key in [k for k in _CACHED_VALUES if k[0] == base_name]:
+            del _CACHED_VALUES[key]
@@ -5,7 +5,7 @@ import shlex
 import json
 import os
 from pathlib import Path
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Iterator, Optional, Union
 
 
@@ -33,11 +33,34 @@ class Venv(EnvironmentManager):
     """Venv environment"""
 
 
+def _decode_output(output: Optional[bytes]) -> str:
+    if not output:
+        return ""
+    return output.replace(b"\r\n", b"\n").decode()
+
+
 @dataclass
 class ProcessResult:
     code: int
-    stdout: str
-    stderr: str
+    raw_stdout: bytes
+    raw_stderr: bytes
+
+    # decoded once on first access, callers checking only the return code
+    # skip decoding
+    _stdout: Optional[str] = field(default=None, init=False, repr=False)
+    _stderr: Optional[str] = field(default=None, init=False, repr=False)
+
+    @property
+    def stdout(self) -> str:
+        if self._stdout is None:
+            self._stdout = _decode_output(self.raw_stdout)
+        return self._stdout
+
+    @property
+    def stderr(self) -> str:
+        if self._stderr is None:
+            self._stderr = _decode_output(self.raw_stderr)
+        return self._stderr
 
 
 if os.name == "nt":
@@ -63,8 +86,6 @@ def run_childprocess(command: Union[list, str], **kwargs) -> ProcessResult:
     )
 
     stdout, stderr = proc.communicate()
-    stdout = stdout.replace(b"\r\n", b"\n").decode() if stdout else ""
-    stderr = stderr.replace(b"\r\n", b"\n").decode() if stderr else ""
     return ProcessResult(proc.returncode, stdout, stderr)
 
 
@@ -1,10 +1,12 @@
 """Workspace module"""
 
 import logging
+import sys
 import threading
 from collections import namedtuple
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterator, List, Any, Optional, Tuple
 
 import sublime
 
@@ -13,6 +15,7 @@ from .document import BufferedDocument
 
 PathStr = str
 RowColIndex = namedtuple("RowColIndex", ["row", "column"])
+ViewDocumentMap = Dict[sublime.View, BufferedDocument]
 LOGGER = logging.getLogger(LOGGING_CHANNEL)
 
 
@@ -21,42 +24,99 @@ class Workspace:
         # Map document by view is easier to track if view is valid.
         # If we map by file name, one document my related to multiple 'View'
         # and some times the 'View' is invalid.
-        self.documents: Dict[sublime.View, BufferedDocument] = {}
+        self.documents: ViewDocumentMap = {}
+        # Index documents by file name to prevent scanning all documents.
+        self._documents_by_name: Dict[PathStr, ViewDocumentMap] = {}
+
+        # Maps are copy-on-write snapshots. Writers build new maps under lock
+        # then rebind them, readers use current snapshot without lock.
         self._lock = threading.Lock()
 
     def reset(self):
         """"""
         with self._lock:
-            self.documents.clear()
+            self.documents = {}
+            self._documents_by_name = {}
 
     def get_document(
         self, view: sublime.View, /, default: Any = None
     ) -> Optional[BufferedDocument]:
-        with self._lock:
-            return self.documents.get(view, default)
+        return self.documents.get(view, default)
 
     def add_document(self, document: BufferedDocument):
         with self._lock:
-            self.documents[document.view] = document
+            documents = dict(self.documents)
+            documents_by_name = dict(self._documents_by_name)
+
+            if older := documents.get(document.view):
+                self._unindex_document(documents_by_name, older)
+
+            documents[document.view] = document
+            views = dict(documents_by_name.get(document.file_name, {}))
+            views[document.view] = document
+            documents_by_name[document.file_name] = views
+
+            self.documents = documents
+            self._documents_by_name = documents_by_name
 
     def remove_document(self, view: sublime.View):
         with self._lock:
+            documents = dict(self.documents)
             try:
-                del self.documents[view]
+                document = documents.pop(view)
             except KeyError as err:
                 LOGGER.debug("document not found %s", err)
-                pass
+                return
+
+            documents_by_name = dict(self._documents_by_name)
+            self._unindex_document(documents_by_name, document)
+
+            self.documents = documents
+            self._documents_by_name = documents_by_name
+
+    def update_document_name(self, view: sublime.View):
+        """reindex document if view renamed, e.g. 'View.retarget()'"""
+        with self._lock:
+            document = self.documents.get(view)
+            file_name = view.file_name()
+            if not (document and file_name) or document.file_name == file_name:
+                return
+
+            documents_by_name = dict(self._documents_by_name)
+            self._unindex_document(documents_by_name, document)
+
+            document.file_name = sys.intern(file_name)
+            views = dict(documents_by_name.get(document.file_name, {}))
+            views[document.view] = document
+            documents_by_name[document.file_name] = views
+
+            self._documents_by_name = documents_by_name
+
+    @staticmethod
+    def _unindex_document(
+        documents_by_name: Dict[PathStr, ViewDocumentMap], document: BufferedDocument
+    ):
+        views = dict(documents_by_name.get(document.file_name, {}))
+        views.pop(document.view, None)
+        if views:
+            documents_by_name[document.file_name] = views
+        else:
+            documents_by_name.pop(document.file_name, None)
 
     def get_document_by_name(
         self, file_name: PathStr, /, default: Any = None
     ) -> Optional[BufferedDocument]:
         """get document by name"""
 
-        with self._lock:
-            for view, document in self.documents.items():
-                if view.file_name() == file_name:
-                    return document
-            return default
+        if views := self._documents_by_name.get(file_name):
+            return next(iter(views.values()))
+
+        # Index use file name when document added. View may be renamed,
+        # e.g. 'save as' or 'View.retarget()', before document reopened.
+        for view, document in self.documents.items():
+            if view.file_name() == file_name:
+                return document
+        return default
 
     def get_documents(
         self, file_name: Optional[PathStr] = None
@@ -64,12 +124,9 @@ class Workspace:
         """get documents.
         If file_name assigned, return documents with file_name filtered.
         """
-        with self._lock:
-            if not file_name:
-                return [doc for _, doc in self.documents.items()]
-            return [
-                doc for _, doc in self.documents.items() if doc.file_name == file_name
-            ]
+        if not file_name:
+            return list(self.documents.values())
+        return list(self._documents_by_name.get(file_name, {}).values())
 
 
 def get_workspace_path(view: sublime.View, return_parent: bool = True) -> str:
@@ -88,11 +145,25 @@ def get_workspace_path(view: sublime.View, return_parent: bool = True) -> str:
     if not file_name:
         return ""
 
-    if folders := [
-        folder for folder in view.window().folders() if file_name.startswith(folder)
-    ]:
-        # File is opened in multiple folder
-        return max(folders)
+    window = view.window()
+    window_folders = tuple(window.folders()) if window else ()
+    return _find_workspace_path(file_name, window_folders, return_parent)
+
+
+@lru_cache(maxsize=256)
+def _find_workspace_path(
+    file_name: PathStr, window_folders: Tuple[PathStr, ...], return_parent: bool
+) -> str:
+    # 'str.startswith()' check all folders at once if prefix is tuple
+    if window_folders and file_name.startswith(window_folders):
+        # Most window only has single folder
+        if len(window_folders) == 1:
+            return window_folders[0]
+
+        # File is opened in multiple folder, nearest folder sorted last
+        for folder in sorted(window_folders, reverse=True):
+            if file_name.startswith(folder):
+                return folder
 
     if not return_parent:
         return ""
@@ -122,9 +193,8 @@ def rename_document(old_name: PathStr, new_name: PathStr):
     path.rename(new_name)
 
     # Sublime Text didn't update the view target if renamed
-    for window in sublime.windows():
-        for view in [v for v in window.views() if v.file_name() == old_name]:
-            view.retarget(new_name)
+    for view in _get_views_by_name(old_name):
+        view.retarget(new_name)
 
 
 def delete_document(file_name: PathStr):
@@ -133,6 +203,13 @@ def delete_document(file_name: PathStr):
     path.unlink()
 
     # Sublime Text didn't close deleted file
+    for view in _get_views_by_name(file_name):
+        view.close()
+
+
+def _get_views_by_name(file_name: PathStr) -> Iterator[sublime.View]:
+    """get views opening file_name in all windows"""
     for window in sublime.windows():
-        for view in [v for v in window.views() if v.file_name() == file_name]:
-            view.close()
+        for view in window.views():
+            if view.file_name() == file_name:
+                yield view
@@ -1,6 +1,10 @@
 """Python tools for Sublime Text"""
 
+from __future__ import annotations
+
 import logging
+import threading
+from types import MappingProxyType
 from typing import List, Optional
 
 import sublime
@@ -11,35 +15,59 @@ from .internal.constant import LOGGING_CHANNEL
 from .internal import plugin_implementation as plugin_impl
 from .internal.session import Session
 from .internal.pyserver_implementation import get_session
-from .internal.sublime_settings import Settings
+from .internal.sublime_settings import get_settings
 from .internal.document import is_valid_document
 
 
 LOGGER = logging.getLogger(LOGGING_CHANNEL)
-SESSION: Session = get_session()
+SESSION: Optional[Session] = None
+"""session created at first use, not at plugin import"""
+_SESSION_LOCK = threading.Lock()
+
+
+def get_plugin_session() -> Session:
+    """get plugin session, create if not created yet"""
+    global SESSION
+    if SESSION is None:
+        # events may come from main and worker thread at the same time
+        with _SESSION_LOCK:
+            if SESSION is None:
+                SESSION = get_session()
+    return SESSION
 
 
 def setup_logger(level: int):
     """"""
     LOGGER.setLevel(level)
+    # 'plugin_loaded()' called again on plugin reload
+    if LOGGER.handlers:
+        return
+
     fmt = logging.Formatter("%(levelname)s %(filename)s:%(lineno)d  %(message)s")
 
+    # records already handled here, root logger handlers not needed
+    LOGGER.propagate = False
+
     sh = logging.StreamHandler()
     sh.setFormatter(fmt)
     LOGGER.addHandler(sh)
 
 
-def get_logging_settings():
-    """get logging level defined in '*.sublime-settings'"""
-    level_map = {
+LEVEL_MAP = MappingProxyType(
+    {
         "error": logging.ERROR,
         "warning": logging.WARNING,
         "info": logging.INFO,
         "verbose": logging.DEBUG,
     }
-    with Settings() as settings:
-        settings_level = settings.get("logging")
-        return level_map.get(settings_level, logging.ERROR)
+)
+"""logging level mapped by settings value"""
+
+
+def get_logging_settings():
+    """get logging level defined in '*.sublime-settings'"""
+    settings_level = get_settings("logging")
+    return LEVEL_MAP.get(settings_level, logging.ERROR)
 
 
 def plugin_loaded():
@@ -49,98 +77,97 @@ def plugin_loaded():
 
 def plugin_unloaded():
     """executed before plugin unloaded"""
+    # pending hover is useless after unloaded, don't wait it
+    plugin_impl.shutdown_hover_executor()
+    # Terminate synchronously, the server process wait is bounded. Session
+    # initialize state is shared, reloaded plugin session must not be reset
+    # by this session termination.
     if SESSION:
         SESSION.terminate()
 
 
+class SessionMixin:
+    """provide lazy created plugin session"""
+
+    @property
+    def session(self) -> Session:
+        return get_plugin_session()
+
+    @staticmethod
+    def is_session_ready() -> bool:
+        """check session ready without creating it"""
+        return bool(SESSION) and SESSION.is_ready()
+
+
 class PythonToolsOpenEventListener(
-    sublime_plugin.EventListener, plugin_impl.OpenEventListener
+    sublime_plugin.EventListener, plugin_impl.OpenEventListener, SessionMixin
 ):
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.session = SESSION
-
     def on_activated_async(self, view: sublime.View):
         self._on_activated_async(view)
 
-    def on_load(self, view: sublime.View):
-        self._on_load(view)
+    def on_load_async(self, view: sublime.View):
+        self._on_load_async(view)
 
-    def on_reload(self, view: sublime.View):
-        self._on_reload(view)
+    def on_reload_async(self, view: sublime.View):
+        self._on_reload_async(view)
 
-    def on_revert(self, view: sublime.View):
-        self._on_revert(view)
+    def on_revert_async(self, view: sublime.View):
+        self._on_revert_async(view)
 
 
 class PythonToolsSaveEventListener(
-    sublime_plugin.EventListener, plugin_impl.SaveEventListener
+    sublime_plugin.EventListener, plugin_impl.SaveEventListener, SessionMixin
 ):
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.session = SESSION
-
     def on_post_save_async(self, view: sublime.View):
         self._on_post_save_async(view)
 
 
 class PythonToolsCloseEventListener(
-    sublime_plugin.EventListener, plugin_impl.CloseEventListener
+    sublime_plugin.EventListener, plugin_impl.CloseEventListener, SessionMixin
 ):
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.session = SESSION
-
     def on_close(self, view: sublime.View):
         self._on_close(view)
 
 
 class PythonToolsTextChangeListener(
-    sublime_plugin.TextChangeListener, plugin_impl.TextChangeListener
+    sublime_plugin.TextChangeListener, plugin_impl.TextChangeListener, SessionMixin
 ):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.session = SESSION
-
     def on_text_changed(self, changes: List[sublime.TextChange]):
+        # called for any buffer on every keystroke, don't create session
+        if not self.is_session_ready():
+            # changes not sent to server, cached completion is outdated
+            plugin_impl.COMPLETION_CACHE.clear(self.buffer.id())
+            return
+
         self._on_text_changed(changes)
 
 
 class PythonToolsCompletionEventListener(
-    sublime_plugin.EventListener, plugin_impl.CompletionEventListener
+    sublime_plugin.EventListener, plugin_impl.CompletionEventListener, SessionMixin
 ):
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.session = SESSION
-
     def on_query_completions(
         self, view: sublime.View, prefix: str, locations: List[int]
     ) -> sublime.CompletionList:
-        return self._on_query_completions(view, prefix, locations)
+        # fall back to default completions if session not ready
+        if self.is_session_ready():
+            return self._on_query_completions(view, prefix, locations)
+        return None
 
 
 class PythonToolsHoverEventListener(
-    sublime_plugin.EventListener, plugin_impl.HoverEventListener
+    sublime_plugin.EventListener, plugin_impl.HoverEventListener, SessionMixin
 ):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.session = SESSION
-
     def on_hover(self, view: sublime.View, point: int, hover_zone: HoverZone):
         self._on_hover(view, point, hover_zone)
 
 
 class PythonToolsDocumentSignatureHelpCommand(
-    sublime_plugin.TextCommand, plugin_impl.DocumentSignatureHelpCommand
+    sublime_plugin.TextCommand, plugin_impl.DocumentSignatureHelpCommand, SessionMixin
 ):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.session = SESSION
-
     def run(self, edit: sublime.Edit, point: int):
         self._run(edit, point)
 
@@ -149,12 +176,8 @@ class PythonToolsDocumentSignatureHelpCommand(
 
 
 class PythonToolsDocumentFormattingCommand(
-    sublime_plugin.TextCommand, plugin_impl.DocumentFormattingCommand
+    sublime_plugin.TextCommand, plugin_impl.DocumentFormattingCommand, SessionMixin
 ):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.session = SESSION
-
     def run(self, edit: sublime.Edit):
         self._run(edit)
 
@@ -163,12 +186,8 @@ class PythonToolsDocumentFormattingCommand(
 
 
 class PythonToolsGotoDefinitionCommand(
-    sublime_plugin.TextCommand, plugin_impl.GotoDefinitionCommand
+    sublime_plugin.TextCommand, plugin_impl.GotoDefinitionCommand, SessionMixin
 ):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.session = SESSION
-
     def run(
         self,
         edit: sublime.Edit,
@@ -186,13 +205,9 @@ class PythonToolsGotoDefinitionCommand(
 
 
 class PythonToolsPrepareRenameCommand(
-    sublime_plugin.TextCommand, plugin_impl.PrepareRenameCommand
+    sublime_plugin.TextCommand, plugin_impl.PrepareRenameCommand, SessionMixin
 ):
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.session = SESSION
-
     def run(self, edit: sublime.Edit, event: Optional[dict] = None):
         self._run(edit, event)
 
@@ -203,11 +218,9 @@ class PythonToolsPrepareRenameCommand(
         return True
 
 
-class PythonToolsRenameCommand(sublime_plugin.TextCommand, plugin_impl.RenameCommand):
-
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.session = SESSION
+class PythonToolsRenameCommand(
+    sublime_plugin.TextCommand, plugin_impl.RenameCommand, SessionMixin
+):
 
     def run(self, edit: sublime.Edit, row: int, column: int, new_name: str):
         self._run(edit, row, column, new_name)
@@ -227,13 +240,10 @@ class PythonToolsApplyTextChangesCommand(
 
 class PythonToolsTerminateCommand(sublime_plugin.WindowCommand):
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.session = SESSION
-
+    # don't create session only to terminate it
     def run(self):
-        if self.session:
-            self.session.terminate()
+        if SESSION:
+            SESSION.terminate()
 
     def is_visible(self):
-        return self.session and self.session.is_ready()
+        return SESSION and SESSION.is_ready()